@@ -9,8 +9,130 @@
 # - And many other protocols
 # ============================================================================
 
+import functools
 import math
 
+import prime
+
+# Optional speed-up: gmpy2 wraps GMP, a C library tuned for huge numbers
+# Everything works without it - we just fall back to plain Python
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+
+# Trial division is only used for factors below this bound.
+# Anything bigger is left to Pollard's Rho (see _pollard_brent below).
+_TRIAL_DIVISION_LIMIT = 1000
+
+
+def _odd_primes_below(limit):
+    """
+    List the odd primes below limit with the Sieve of Eratosthenes.
+    
+    Start with every number marked as "maybe prime", then cross out
+    the multiples of each prime we find. Whatever is left is prime.
+    
+    Args:
+        limit: Upper bound (not included)
+    
+    Returns:
+        Tuple of the odd primes below limit: (3, 5, 7, 11, ...)
+    """
+    is_candidate = bytearray([1]) * limit
+    for p in range(3, math.isqrt(limit) + 1, 2):
+        if is_candidate[p]:
+            # Cross out p*p, p*p + 2p, ... (smaller multiples are already gone)
+            is_candidate[p * p::2 * p] = bytes(len(range(p * p, limit, 2 * p)))
+    return tuple(p for p in range(3, limit, 2) if is_candidate[p])
+
+
+# The odd primes below _TRIAL_DIVISION_LIMIT: 3, 5, 7, 11, ..., 997
+# This runs once, when the module is imported, so it needs to be quick
+_SMALL_ODD_PRIMES = _odd_primes_below(_TRIAL_DIVISION_LIMIT)
+
+
+def _pollard_brent(n, c):
+    """
+    Find a non-trivial factor of a composite n using Pollard's Rho (Brent's variant).
+    
+    The idea:
+    - The sequence y -> y^2 + c (mod n) eventually cycles
+    - Modulo an unknown prime factor p, it cycles much sooner (after ~sqrt(p) steps)
+    - When two values collide modulo p, gcd(x - y, n) reveals p
+    
+    Brent's trick: multiply many |x - y| values together and take one gcd
+    per batch, instead of one gcd per step.
+    
+    This needs about n^(1/4) steps instead of the n^(1/2) of trial division.
+    
+    Args:
+        n: An odd composite number
+        c: The constant in y -> y^2 + c (try another one if this fails)
+    
+    Returns:
+        A factor of n (may be n itself if this c was unlucky)
+    """
+    y = 2
+    m = 128  # How many steps we batch before each gcd
+    r = 1
+    q = 1
+    g = 1
+    
+    while g == 1:
+        x = y
+        for _ in range(r):
+            y = (y * y + c) % n
+        
+        k = 0
+        while k < r and g == 1:
+            ys = y
+            for _ in range(min(m, r - k)):
+                y = (y * y + c) % n
+                q = q * abs(x - y) % n
+            g = math.gcd(q, n)
+            k += m
+        
+        r *= 2
+    
+    # The batch overshot (gcd is n): redo it one step at a time
+    if g == n:
+        g = 1
+        while g == 1:
+            ys = (ys * ys + c) % n
+            g = math.gcd(abs(x - ys), n)
+    
+    return g
+
+
+def _split_into_primes(n):
+    """
+    Break n into its prime factors using Miller-Rabin (prime.is_prime) and Pollard's Rho.
+    
+    Args:
+        n: A number > 1 with no small factors left
+    
+    Returns:
+        List of prime factors, with repeats (e.g. [101, 101, 103])
+    """
+    if prime.is_prime(n):
+        return [n]
+    
+    # Perfect squares make the rho cycle degenerate, handle them directly
+    root = math.isqrt(n)
+    if root * root == n:
+        return _split_into_primes(root) * 2
+    
+    # Keep trying new constants c until we split n
+    c = 1
+    factor = n
+    while factor == n:
+        factor = _pollard_brent(n, c)
+        c += 1
+    
+    return _split_into_primes(factor) + _split_into_primes(n // factor)
+
 
 def factorize(n):
     """
@@ -27,9 +149,27 @@ def factorize(n):
         n: The number to factorize (must be positive)
     
     Returns:
-        Dictionary: {prime_factor: power, ...}
+        Dictionary: {prime_factor: power, ...}, primes in increasing order
         Example: factorize(12) returns {2: 2, 3: 1}
     """
+    # Factoring is the slowest step in this file, and the same P-1 often gets
+    # factored several times in a row (find_generators, get_prime_factors,
+    # format_factorization, ...), so the real work is cached in _factorize.
+    # We hand back a copy so callers can't accidentally change the cache.
+    return dict(_factorize(n))
+
+
+@functools.lru_cache(maxsize=32)
+def _factorize(n):
+    """
+    Do the actual work for factorize (results are cached).
+    
+    Args:
+        n: The number to factorize (must be positive)
+    
+    Returns:
+        Dictionary: {prime_factor: power, ...}, primes in increasing order
+    """
     if n < 1:
         raise ValueError("Number must be positive")
     
@@ -42,45 +182,56 @@ def factorize(n):
     
     # Step 1: Check if 2 is a factor (handle even numbers)
     # We do this separately because 2 is the only even prime
-    count_2 = 0
-    while n % 2 == 0:
-        count_2 += 1
-        n = n // 2  # Divide n by 2
-    
-    # If we found some 2's, add them to our factors
-    if count_2 > 0:
+    # Bit trick: n & -n keeps only the lowest 1 bit of n (e.g. 12 = 0b1100 -> 0b100),
+    # so its bit_length() - 1 is the number of trailing zeros = how many times
+    # 2 divides n. Then one shift (n >> count) divides out all the 2's at once.
+    if n % 2 == 0:
+        count_2 = (n & -n).bit_length() - 1
         factors[2] = count_2
-    
-    # Step 2: Check odd factors from 3 onwards
+        n = n >> count_2  # Divide n by 2^count_2
+    
+    # Step 2: Check small prime factors from 3 up to 1000
+    # Trial division is great for small primes, but it gets hopeless for
+    # big numbers (checking up to sqrt(n) means ~10^9 steps for a 60-bit n).
+    # So we only use it to strip off the "easy" small factors here.
+    #
+    # The list of small primes is computed once when the module loads, so
+    # this loop only tries the 167 odd primes below 1000 - no time wasted
+    # on composites like 9, 15 or 21, and no step bookkeeping per iteration.
+    #
     # We only need to check up to sqrt(n) because:
     # If n = a * b and both a and b > sqrt(n), then a * b > n (impossible!)
-    sqrt_n = int(math.isqrt(n))
-    i = 3  # Start from 3 (first odd prime after 2)
-    
-    while i <= sqrt_n:
-        count_i = 0
+    # Comparing p * p <= n means we never have to recompute sqrt(n).
+    for p in _SMALL_ODD_PRIMES:
+        if p * p > n:
+            break
         
-        # Count how many times i divides n
-        while n % i == 0:
-            count_i += 1
-            n = n // i
+        count_p = 0
         
-        # If i is a factor, add it to our dictionary
-        if count_i > 0:
-            factors[i] = count_i
-            # Update sqrt_n because n got smaller
-            sqrt_n = int(math.isqrt(n))
+        # Count how many times p divides n
+        while n % p == 0:
+            count_p += 1
+            n = n // p
         
-        # Move to next odd number
-        i += 2
-    
-    # Step 3: If n is still > 1, it's a prime factor itself
-    # This happens when n is prime or has one large prime factor
+        # If p is a factor, add it to our dictionary
+        if count_p > 0:
+            factors[p] = count_p
+    
+    # Step 3: Whatever is left over has no factors below 1000
+    # - If it's below 1000^2, it can't be a product of two such factors,
+    #   so the leftover n is a prime
+    # - Otherwise we hand it to Pollard's Rho to split it into primes
     if n > 1:
-        if n in factors:
-            factors[n] += 1
+        if n < _TRIAL_DIVISION_LIMIT * _TRIAL_DIVISION_LIMIT:
+            large_primes = [n]
         else:
-            factors[n] = 1
+            large_primes = sorted(_split_into_primes(n))
+        
+        for p in large_primes:
+            if p in factors:
+                factors[p] += 1
+            else:
+                factors[p] = 1
     
     return factors
 
@@ -101,24 +252,16 @@ def get_prime_factors(n):
         List of prime factors (sorted)
     """
     # First get the full factorization
-    factors_dict = factorize(n)
+    factors_dict = _factorize(n)
     
     # If no factors, return empty list
     if len(factors_dict) == 0:
         return []
     
     # Extract just the prime numbers (keys of the dictionary)
-    primes = list(factors_dict.keys())
-    
-    # Sort them (simple approach - in real code we'd use sorted())
-    # Using bubble sort because it's simple to understand
-    for i in range(len(primes)):
-        for j in range(len(primes) - 1 - i):
-            if primes[j] > primes[j + 1]:
-                # Swap them
-                temp = primes[j]
-                primes[j] = primes[j + 1]
-                primes[j + 1] = temp
+    # No sorting needed: factorize adds the primes in increasing order,
+    # and Python dictionaries remember the order keys were added in
+    primes = list(factors_dict)
     
     return primes
 
@@ -137,25 +280,22 @@ def format_factorization(n):
     Returns:
         String like "2^2 * 3" or "7" or "2^3"
     """
-    factors = factorize(n)
+    factors = _factorize(n)
     
     # Special case: 1 has no factors
     if len(factors) == 0:
         return "1"
     
-    # Sort the primes
-    primes = sorted(factors.keys())
-    
     # Build the string
+    # factorize already gives us the primes in increasing order
     parts = []
-    for prime in primes:
-        power = factors[prime]
+    for p, power in factors.items():
         if power == 1:
             # If power is 1, just write the prime (e.g., "3" not "3^1")
-            parts.append(str(prime))
+            parts.append(str(p))
         else:
             # If power > 1, write it with exponent (e.g., "2^2")
-            parts.append(f"{prime}^{power}")
+            parts.append(f"{p}^{power}")
     
     # Join all parts with " * "
     return " * ".join(parts)
@@ -191,32 +331,128 @@ def modular_power(base, exponent, modulus):
     if modulus == 1:
         return 0
     
-    # Start with result = 1
-    result = 1
-    
-    # Reduce base modulo modulus first (makes numbers smaller)
-    base = base % modulus
-    
-    # Make sure exponent is an integer
-    exp = int(exponent)
-    
     # Fast exponentiation algorithm (also called "square and multiply")
-    # The idea: write exponent in binary, then square base repeatedly
-    while exp > 0:
-        # If current bit is 1, multiply result by base
-        if exp % 2 == 1:
-            result = (result * base) % modulus
+    # The idea: write exponent in binary, then square base repeatedly:
+    #
+    #     result = 1
+    #     while exp > 0:
+    #         if exp % 2 == 1:
+    #             result = (result * base) % modulus
+    #         base = (base * base) % modulus
+    #         exp = exp // 2
+    #
+    # Python's built-in pow(base, exp, modulus) runs exactly this kind of
+    # algorithm (with a sliding window and fast big-int multiplication),
+    # but in C - so it's many times faster than the loop above.
+    # With gmpy2 installed we use GMP's powmod, which is faster still for
+    # crypto-sized numbers (hundreds of digits).
+    if gmpy2 is not None:
+        return int(gmpy2.powmod(base % modulus, int(exponent), modulus))
+    
+    return pow(base % modulus, int(exponent), modulus)
+
+
+class MontgomeryContext:
+    """
+    Modular arithmetic in "Montgomery form" for a fixed odd modulus P.
+    
+    Why does this exist?
+    - Computing x % P needs a division, which is the slowest basic operation
+    - When we do MANY operations with the same P (like modular powers),
+      Montgomery's trick replaces each division by multiplications,
+      a bit mask and a shift (dividing by R = 2^k is just a shift!)
+    - Real crypto libraries (OpenSSL, GMP, ...) use this for RSA and
+      Diffie-Hellman
+    
+    The idea:
+    - Pick R = 2^k > P and store every number x as x * R mod P
+    - reduce(T) computes T / R mod P using only *, & and >>
+    - Multiplying two Montgomery numbers and calling reduce() gives the
+      Montgomery form of their product
+    
+    Note: in pure Python this is slower than the built-in pow, which
+    already does all of this in C. That's why find_generators uses pow;
+    this class is here to show how the trick works.
+    
+    Example:
+        ctx = MontgomeryContext(7)
+        ctx.power(3, 5)   # 3^5 mod 7 = 5
+    """
+    
+    def __init__(self, P):
+        """
+        Precompute the constants for modulus P.
+        
+        Args:
+            P: An odd modulus (a prime in our use)
+        """
+        if P < 3 or P % 2 == 0:
+            raise ValueError("Montgomery form needs an odd modulus > 1")
+        
+        self.P = P
         
-        # Square the base (this corresponds to next bit in binary)
-        base = (base * base) % modulus
+        # R = 2^k, the smallest power of 2 bigger than P
+        self.k = P.bit_length()
+        self.R = 1 << self.k
+        self.mask = self.R - 1  # x & mask is the same as x % R
         
-        # Move to next bit (divide exponent by 2)
-        exp = exp // 2
+        # R^2 mod P: multiplying by it (then reducing) converts into Montgomery form
+        # We compute it once here instead of on every conversion
+        self.R2 = (self.R * self.R) % P
+        
+        # -P^(-1) mod R: the magic constant that makes reduce() work
+        self.P_inv = pow(-P, -1, self.R)
     
-    return result
+    def reduce(self, T):
+        """
+        Montgomery reduction (REDC): compute T / R mod P without dividing by P.
+        
+        We add a multiple of P that makes T divisible by R, then shift.
+        
+        Args:
+            T: A number with 0 <= T < P * R
+        
+        Returns:
+            T * R^(-1) mod P
+        """
+        m = ((T & self.mask) * self.P_inv) & self.mask
+        t = (T + m * self.P) >> self.k
+        
+        # t is at most 2P - 1, so one subtraction is enough
+        if t >= self.P:
+            t -= self.P
+        return t
+    
+    def power(self, base, exponent):
+        """
+        Calculate (base^exponent) mod P with square-and-multiply in Montgomery form.
+        
+        We convert into Montgomery form once at the start and back once at
+        the end - everything in between avoids division.
+        
+        Args:
+            base: The base number
+            exponent: The power to raise base to (>= 0)
+        
+        Returns:
+            (base^exponent) mod P
+        """
+        # Convert base and 1 into Montgomery form
+        x = self.reduce((base % self.P) * self.R2)
+        result = self.reduce(self.R2)
+        
+        # Same square-and-multiply as modular_power
+        while exponent > 0:
+            if exponent & 1:
+                result = self.reduce(result * x)
+            x = self.reduce(x * x)
+            exponent >>= 1
+        
+        # Convert back to a normal number
+        return self.reduce(result)
 
 
-def divide_prime_by_factors_of_p_minus_one(P):
+def divide_prime_by_factors_of_p_minus_one(P, factors=None):
     """
     Calculate (P-1) divided by each prime factor of (P-1).
     
@@ -236,6 +472,8 @@ def divide_prime_by_factors_of_p_minus_one(P):
     
     Args:
         P: A prime number
+        factors: The factorization of P-1 from factorize(P - 1), if you
+                 already have it (saves us from factoring P-1 again)
     
     Returns:
         List of (P-1)/q for each prime factor q of (P-1)
@@ -245,7 +483,10 @@ def divide_prime_by_factors_of_p_minus_one(P):
     p_minus_one = P - 1
     
     # Get all prime factors of (P-1)
-    prime_factors = get_prime_factors(p_minus_one)
+    if factors is None:
+        prime_factors = get_prime_factors(p_minus_one)
+    else:
+        prime_factors = list(factors)
     
     # Calculate (P-1) divided by each factor
     results = []
@@ -256,6 +497,91 @@ def divide_prime_by_factors_of_p_minus_one(P):
     return results
 
 
+def _count_generators(P):
+    """
+    Count the generators modulo a prime P without finding them.
+    
+    There are exactly phi(P-1) of them (Euler's totient function), and
+    phi(q1^k1 * q2^k2 * ...) = (P-1) * (1 - 1/q1) * (1 - 1/q2) * ...
+    
+    Args:
+        P: A prime number
+    
+    Returns:
+        phi(P-1), the number of generators modulo P
+    """
+    phi = P - 1
+    for q in _factorize(P - 1):
+        phi = phi // q * (q - 1)
+    return phi
+
+
+def iter_generators(P):
+    """
+    Go through the generators (primitive roots) modulo P one at a time, smallest first.
+    
+    Unlike find_generators, this doesn't build a list of ALL generators up
+    front - it hands them out as it finds them. That's handy in crypto,
+    where we usually need just one generator (e.g. for Diffie-Hellman):
+    we can stop after the first one instead of scanning all of 1..P-1.
+    
+    Example:
+        for g in iter_generators(7):
+            print(g)   # prints 3, then 5
+    
+    Args:
+        P: A prime number
+    
+    Yields:
+        The generators modulo P, in increasing order
+    """
+    # Get (P-1)/q for each prime factor q of (P-1)
+    # These are the exponents we need to check
+    # (they are exact integers, computed with // - float division would
+    # lose precision once P is bigger than 2^53)
+    divisors = divide_prime_by_factors_of_p_minus_one(P, _factorize(P - 1))
+    
+    # There are exactly phi(P-1) generators - after that we can stop early
+    remaining = _count_generators(P)
+    
+    # Check every number from 1 to P-1
+    # (0 is not in the multiplicative group, so we start from 1)
+    for candidate in range(1, P):
+        if remaining == 0:
+            return
+        
+        # Check if candidate^divisor mod P != 1 for all divisors
+        # If ANY divisor gives us 1, then candidate is NOT a generator
+        # (it means the order of candidate is smaller than P-1)
+        # We use the built-in pow(c, d, P): it does the same square-and-multiply
+        # as modular_power, but in C, so it's much faster in this hot loop
+        # (a plain loop is also quicker here than all(...) over a generator
+        # expression, which would create a new generator object per candidate)
+        for divisor in divisors:
+            if pow(candidate, divisor, P) == 1:
+                break  # No need to check other divisors
+        else:
+            # No divisor gave us 1, so candidate is a generator!
+            remaining -= 1
+            yield candidate
+
+
+def any_generator(P):
+    """
+    Find one generator (primitive root) modulo P - the smallest one.
+    
+    Generators are common (a good fraction of 1..P-1 are generators),
+    so this usually only needs to test a few candidates.
+    
+    Args:
+        P: A prime number (for any other P the answer is meaningless)
+    
+    Returns:
+        The smallest generator modulo P
+    """
+    return next(iter_generators(P), None)
+
+
 def find_generators(P):
     """
     Find all generators (primitive roots) of the multiplicative group modulo P.
@@ -276,6 +602,8 @@ def find_generators(P):
     - A number g is a generator if: g^((P-1)/q) != 1 (mod P)
       for ALL prime factors q of (P-1)
     - This is based on Lagrange's theorem from group theory
+    - We only test candidates until we find the first generator g;
+      all the others are g^k for the k with gcd(k, P-1) = 1
     
     Example: P = 7
     - P-1 = 6, prime factors of 6: [2, 3]
@@ -287,36 +615,31 @@ def find_generators(P):
     
     Returns:
         List of all generators (primitive roots) modulo P
+        (use iter_generators or any_generator if you don't need all of them)
+    
+    Raises:
+        ValueError: If P is not prime (the g^k trick below only works for primes)
     """
-    # Get (P-1)/q for each prime factor q of (P-1)
-    # These are the exponents we need to check
-    divisors = divide_prime_by_factors_of_p_minus_one(P)
+    if not prime.is_prime(P):
+        raise ValueError("P must be a prime number")
     
-    # Convert to integers (they should already be integers, but just to be safe)
-    int_divisors = [int(d) for d in divisors]
+    # Step 1: Find just ONE generator g (the smallest one)
+    g = any_generator(P)
     
-    # This list will store all generators we find
+    # Step 2: Every other generator is g^k for some k with gcd(k, P-1) = 1
+    # Why? g^k has order (P-1) / gcd(k, P-1), so it's a generator exactly
+    # when that gcd is 1. Walking g^1, g^2, g^3, ... only costs ONE
+    # multiplication per step instead of several modular powers per candidate.
     generators = []
-    
-    # Check every number from 1 to P-1
-    # (0 is not in the multiplicative group, so we start from 1)
-    for candidate in range(1, P):
-        is_generator = True
-        
-        # Check if candidate^divisor mod P != 1 for all divisors
-        # If ANY divisor gives us 1, then candidate is NOT a generator
-        for divisor in int_divisors:
-            power_result = modular_power(candidate, divisor, P)
-            
-            # If we get 1, this candidate is not a generator
-            # (it means the order of candidate is smaller than P-1)
-            if power_result == 1:
-                is_generator = False
-                break  # No need to check other divisors
-        
-        # If all checks passed, candidate is a generator!
-        if is_generator:
-            generators.append(candidate)
+    order = P - 1
+    x = 1
+    for k in range(1, P):
+        x = (x * g) % P
+        if math.gcd(k, order) == 1:
+            generators.append(x)
+    
+    # The walk visits generators in "g^k order", so sort them for the caller
+    generators.sort()
     
     return generators
 
@@ -10,6 +10,28 @@
 # ============================================================================
 
 import hashlib
+import sys
+
+
+# Supported hash algorithms, looked up by name
+_ALGORITHMS = {
+    # MD5: 128-bit hash (32 hex characters)
+    # WARNING: MD5 is broken! Don't use for security-critical applications
+    'md5': hashlib.md5,
+    
+    # SHA1: 160-bit hash (40 hex characters)
+    # WARNING: SHA1 is also broken! Don't use for new systems
+    'sha1': hashlib.sha1,
+    
+    # SHA256: 256-bit hash (64 hex characters)
+    # This is the one you should use! It's secure and widely used.
+    # Bitcoin uses SHA256 for proof-of-work
+    'sha256': hashlib.sha256,
+    
+    # SHA512: 512-bit hash (128 hex characters)
+    # Even more secure than SHA256, but slower
+    'sha512': hashlib.sha512,
+}
 
 
 def hash_string(data, algorithm='sha256'):
@@ -43,30 +65,147 @@ def hash_string(data, algorithm='sha256'):
     if isinstance(data, str):
         data = data.encode('utf-8')
     
-    # Choose the hash algorithm and compute the hash
-    if algorithm == 'md5':
-        # MD5: 128-bit hash (32 hex characters)
-        # WARNING: MD5 is broken! Don't use for security-critical applications
-        return hashlib.md5(data).hexdigest()
-    
-    elif algorithm == 'sha1':
-        # SHA1: 160-bit hash (40 hex characters)
-        # WARNING: SHA1 is also broken! Don't use for new systems
-        return hashlib.sha1(data).hexdigest()
-    
-    elif algorithm == 'sha256':
-        # SHA256: 256-bit hash (64 hex characters)
-        # This is the one you should use! It's secure and widely used.
-        # Bitcoin uses SHA256 for proof-of-work
-        return hashlib.sha256(data).hexdigest()
-    
-    elif algorithm == 'sha512':
-        # SHA512: 512-bit hash (128 hex characters)
-        # Even more secure than SHA256, but slower
-        return hashlib.sha512(data).hexdigest()
-    
-    else:
+    # Look up the hash algorithm and compute the hash
+    # (one dictionary lookup instead of a chain of string comparisons)
+    constructor = _get_algorithm(algorithm)
+    
+    return constructor(data).hexdigest()
+
+
+def bulk_hash(items, algorithm='sha256'):
+    """
+    Hash many strings (or bytes) at once with the same algorithm.
+    
+    When is this useful?
+    - Hashing all the leaves of a Merkle tree
+    - Checking lots of nonces in a proof-of-work style loop
+    - Fingerprinting many records for deduplication
+    
+    We look the algorithm up only once instead of once per item.
+    
+    We also tell hashlib the hashes are not used for security
+    (usedforsecurity=False, Python 3.9+). This does NOT change the hashes
+    or make them faster - it only keeps MD5/SHA1 usable on FIPS-restricted
+    systems, which otherwise block them. On older Python the flag is skipped.
+    
+    Args:
+        items: Iterable of strings or bytes to hash
+        algorithm: Which hash algorithm to use
+                   Options: 'md5', 'sha1', 'sha256', 'sha512'
+    
+    Returns:
+        List of hexadecimal hash strings, one per item (same order)
+    """
+    constructor = _get_algorithm(algorithm)
+    
+    # The usedforsecurity keyword only exists on Python 3.9+
+    options = {'usedforsecurity': False} if sys.version_info >= (3, 9) else {}
+    
+    return [
+        constructor(item.encode('utf-8') if isinstance(item, str) else item,
+                    **options).hexdigest()
+        for item in items
+    ]
+
+
+def hash_file(path, algorithm='sha256'):
+    """
+    Hash the contents of a file.
+    
+    This is how download pages let you check a file wasn't corrupted or
+    tampered with: they publish the SHA256 of the file, and you compare it
+    with the hash of what you downloaded.
+    
+    We never load the whole file into memory - the file is fed into the
+    hash function piece by piece. On Python 3.11+ hashlib.file_digest does
+    this for us, reading straight into a reusable buffer.
+    
+    Args:
+        path: Path to the file
+        algorithm: Which hash algorithm to use
+                   Options: 'md5', 'sha1', 'sha256', 'sha512'
+    
+    Returns:
+        Hexadecimal string representing the hash of the file
+    """
+    constructor = _get_algorithm(algorithm)
+    
+    with open(path, 'rb') as f:
+        # Python 3.11+ has a built-in helper for this
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, constructor).hexdigest()
+        
+        # Older Python: feed the file in 64 KB chunks ourselves
+        h = constructor()
+        for chunk in iter(lambda: f.read(65536), b''):
+            h.update(chunk)
+        return h.hexdigest()
+
+
+def hash_chunks(chunks, algorithm='sha256'):
+    """
+    Hash several pieces of data as if they were one long message.
+    
+    hash_chunks([a, b, c]) gives the same result as hash_string(a + b + c),
+    but without building the joined string first. The hash object takes
+    in each piece with update(), so even huge inputs never need to sit in
+    memory as one big buffer. bytes, bytearray and memoryview pieces are
+    passed in as they are, without copying.
+    
+    Args:
+        chunks: Iterable of strings, bytes, bytearrays or memoryviews
+        algorithm: Which hash algorithm to use
+                   Options: 'md5', 'sha1', 'sha256', 'sha512'
+    
+    Returns:
+        Hexadecimal string representing the hash of all chunks together
+    """
+    h = _get_algorithm(algorithm)()
+    
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        h.update(chunk)
+    
+    return h.hexdigest()
+
+
+def double_sha256(data):
+    """
+    Compute SHA256(SHA256(data)), the hash Bitcoin uses everywhere.
+    
+    Bitcoin hashes block headers and transactions twice. Proof-of-work
+    mining means finding a header whose double SHA256 is below a target.
+    
+    Unlike hash_string, this returns the raw 32 bytes (not hex), because
+    that's what gets compared against the target or fed into the next hash.
+    
+    Args:
+        data: The bytes (or string) to hash
+    
+    Returns:
+        32 bytes: the double SHA256 digest
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def _get_algorithm(algorithm):
+    """
+    Look up the hashlib constructor for an algorithm name.
+    
+    Args:
+        algorithm: 'md5', 'sha1', 'sha256' or 'sha512'
+    
+    Returns:
+        The hashlib constructor (e.g. hashlib.sha256)
+    """
+    constructor = _ALGORITHMS.get(algorithm)
+    if constructor is None:
         raise ValueError(f"Unsupported algorithm: {algorithm}. Use 'md5', 'sha1', 'sha256', or 'sha512'")
+    return constructor
 
 
 def simple_hash(data):
@@ -101,4 +240,9 @@ if __name__ == "__main__":
     print(f"SHA256: {hash_string(test_string, 'sha256')}")
     print(f"SHA512: {hash_string(test_string, 'sha512')}")
     print()
+    print(f"Bulk SHA256 of ['a', 'b', 'c']: {bulk_hash(['a', 'b', 'c'])}")
+    print(f"SHA256 of this file: {hash_file(__file__)}")
+    print(f"SHA256 of ['hello', ' ', 'world'] in chunks: {hash_chunks(['hello', ' ', 'world'])}")
+    print(f"Double SHA256 (Bitcoin-style): {double_sha256(test_string).hex()}")
+    print()
     print(f"Simple (not secure!): {simple_hash(test_string)}")
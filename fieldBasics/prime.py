@@ -1,5 +1,3 @@
-import math
-
 # ============================================================================
 # PRIME NUMBER UTILITIES FOR CRYPTOGRAPHY
 # ============================================================================
@@ -10,6 +8,22 @@ import math
 # - Elliptic curve cryptography (works over prime fields)
 # ============================================================================
 
+# Optional speed-up: gmpy2 wraps GMP, a C library tuned for huge numbers
+# Everything works without it - we just fall back to plain Python
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+
+# Small primes used as Miller-Rabin witnesses
+# Testing with all of them gives the exact answer for every n < 3.3 * 10^24
+_MR_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+# Odd primes below 100, used to quickly throw away candidates in find_prime_around
+_SMALL_ODD_PRIMES = (3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47,
+                     53, 59, 61, 67, 71, 73, 79, 83, 89, 97)
+
 
 def is_prime(n):
     """
@@ -18,6 +32,18 @@ def is_prime(n):
     A prime number is only divisible by 1 and itself.
     This is super important in crypto because we need primes for secure systems!
     
+    How do we check? Trying every divisor up to sqrt(n) is way too slow
+    for big numbers (~3 * 10^7 steps for n = 10^15). Instead we use the
+    Miller-Rabin test, which is what real crypto libraries do:
+    - Write n-1 = d * 2^s with d odd
+    - If n is prime, then for every a: either a^d = 1 (mod n), or
+      a^(d * 2^r) = -1 (mod n) for some r < s (by Fermat's little theorem)
+    - If some a breaks this rule, a is a "witness" that n is composite
+    
+    With the witnesses 2, 3, 5, ..., 41 the answer is exact for all
+    n < 3.3 * 10^24 (for bigger n a composite slipping through is
+    astronomically unlikely). That's only 13 modular powers!
+    
     Args:
         n: The number we want to check
     
@@ -28,25 +54,51 @@ def is_prime(n):
     if n < 2:
         return False
     
-    # 2 is the only even prime number
-    if n == 2:
-        return True
-    
-    # If n is even (and not 2), it's not prime
-    # This saves us time - we don't need to check even numbers
-    if n % 2 == 0:
-        return False
+    # Small primes are handled directly, and anything divisible by
+    # one of them (like even numbers) is not prime
+    for p in _MR_WITNESSES:
+        if n == p:
+            return True
+        if n % p == 0:
+            return False
     
-    # Now we check if n is divisible by any odd number from 3 to sqrt(n)
-    # Why sqrt(n)? Because if n has a factor larger than sqrt(n),
-    # it must also have a factor smaller than sqrt(n)
-    # Example: 100 = 10 * 10, so we only need to check up to 10
-    sqrt_n = int(math.isqrt(n))
+    return _miller_rabin(n)
+
+
+def _miller_rabin(n):
+    """
+    Run the Miller-Rabin test with all of _MR_WITNESSES.
     
-    # Check only odd numbers (we already checked 2)
-    for i in range(3, sqrt_n + 1, 2):
-        # If n is divisible by i, it's not prime
-        if n % i == 0:
+    Expects an odd n > 41 (is_prime and find_prime_around already
+    took care of small numbers and small factors).
+    """
+    # If gmpy2 is installed, let GMP run each witness round in C
+    # (it's much faster for crypto-sized numbers with hundreds of digits)
+    # Same witnesses as below, so the answer doesn't depend on gmpy2 being installed
+    if gmpy2 is not None:
+        return all(gmpy2.is_strong_prp(n, a) for a in _MR_WITNESSES)
+    
+    # Write n-1 as d * 2^s where d is odd
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d = d // 2
+        s += 1
+    
+    # Try each witness
+    for a in _MR_WITNESSES:
+        # pow(a, d, n) is Python's built-in fast modular exponentiation
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        
+        # Keep squaring: a^(2d), a^(4d), ... looking for -1 (which is n-1)
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            # We never found -1, so a proves that n is composite
             return False
     
     # If we got here, n is prime!
@@ -74,10 +126,22 @@ def find_prime_around(target):
         num += 1
     
     # Keep checking numbers until we find a prime
-    # This is a simple approach - in real crypto, we use more sophisticated methods
+    # Most candidates have a small factor (1/3 are divisible by 3, 1/5 by 5, ...),
+    # so we first do a cheap check against the odd primes below 100 and only
+    # run the (more expensive) Miller-Rabin test on the ~20% that survive
     while True:
-        if is_prime(num):
-            return num
+        if num <= _SMALL_ODD_PRIMES[-1]:
+            # Tiny numbers take the normal path
+            if is_prime(num):
+                return num
+        else:
+            for p in _SMALL_ODD_PRIMES:
+                if num % p == 0:
+                    break
+            else:
+                # No small factor, so go straight to Miller-Rabin
+                if _miller_rabin(num):
+                    return num
         # Only check odd numbers (skip even ones)
         num += 2
 
@@ -1,6 +1,7 @@
 # pip install --trusted-host https://mirror-pypi.runflare.com -i https://mirror-pypi.runflare.com/simple/ ipython  
 import rsa
 import sys
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 def generate_keys():
     # Generate public and private keys
@@ -24,8 +25,15 @@ def decrypt_message():
     with open('cipher.txt', 'rb') as f:
         cipher_text = f.read()
     
-    # Decrypt message
-    message = rsa.decrypt(cipher_text, privkey)
+    # Split into RSA-encrypted session key | 12-byte nonce | AES-GCM ciphertext
+    key_size = rsa.common.byte_size(privkey.n)
+    encrypted_key = cipher_text[:key_size]
+    nonce = cipher_text[key_size:key_size + 12]
+    encrypted_message = cipher_text[key_size + 12:]
+    
+    # Decrypt the session key with RSA, then the message with AES-GCM
+    session_key = rsa.decrypt(encrypted_key, privkey)
+    message = AESGCM(session_key).decrypt(nonce, encrypted_message, None)
     print("Decrypted message:", message.decode('utf-8'))
 
 if __name__ == "__main__":
@@ -1,16 +1,36 @@
+import functools
+import os
 import rsa
 import sys
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+@functools.lru_cache(maxsize=None)
+def load_public_key():
+    # Read and parse Alice's public key once, reuse it on later calls
+    # (raw os.read of the whole small file, no buffered file object needed)
+    fd = os.open('alice_public.key', os.O_RDONLY)
+    try:
+        data = os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+    return rsa.PublicKey.load_pkcs1(data)
 
 def encrypt_message():
     # Read Alice's public key
-    with open('alice_public.key', 'rb') as f:
-        pubkey = rsa.PublicKey.load_pkcs1(f.read())
+    pubkey = load_public_key()
     
     # Hardcoded message
     message = "Hello Alice! This is a secret message.       0111111111111111122222ffffffffffffffffffffffffffffffffffffffffff"
     
-    # Encrypt message
-    cipher_text = rsa.encrypt(message.encode('utf-8'), pubkey)
+    # Hybrid encryption: a fresh AES-256-GCM session key encrypts the message
+    # (any length, AES-NI backed), and RSA only encrypts the 32-byte session key
+    session_key = AESGCM.generate_key(bit_length=256)
+    nonce = os.urandom(12)
+    encrypted_key = rsa.encrypt(session_key, pubkey)
+    encrypted_message = AESGCM(session_key).encrypt(nonce, message.encode('utf-8'), None)
+    
+    # Cipher text layout: RSA-encrypted session key | 12-byte nonce | AES-GCM ciphertext
+    cipher_text = encrypted_key + nonce + encrypted_message
     
     # Save cipher text
     with open('cipher.txt', 'wb') as f:
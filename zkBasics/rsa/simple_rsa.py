@@ -1,27 +1,67 @@
-import random
-from math import gcd
+import secrets
+import sys
+
+# Use GMP (via gmpy2) for big-number arithmetic if available
+try:
+    from gmpy2 import mpz, powmod, invert, gcd, is_strong_prp
+except ImportError:
+    from math import gcd
+    mpz = int
+    powmod = pow
+    invert = None
+    is_strong_prp = None
 
 
 def extended_gcd(a, b):
-    """Extended Euclidean Algorithm to find modular inverse"""
-    if a == 0:
-        return b, 0, 1
-    gcd_val, x1, y1 = extended_gcd(b % a, a)
-    x = y1 - (b // a) * x1
-    y = x1
-    return gcd_val, x, y
+    """Extended Euclidean Algorithm to find modular inverse (used when gmpy2 is missing)"""
+    # Iterative version: no recursion depth limit and no per-step call overhead
+    # Invariant: a*old_s + b*old_t == old_r and a*s + b*t == r
+    old_r, r = a, b
+    old_s, s = 1, 0
+    old_t, t = 0, 1
+    while r:
+        q = old_r // r
+        old_r, r = r, old_r - q * r
+        old_s, s = s, old_s - q * s
+        old_t, t = t, old_t - q * t
+    return old_r, old_s, old_t
 
 
 def mod_inverse(a, m):
     """Find modular inverse of a mod m"""
+    if invert is not None:
+        # gmpy2 raises ZeroDivisionError (older versions return 0) if there is no inverse
+        try:
+            inverse = int(invert(a % m, m))
+        except ZeroDivisionError:
+            inverse = 0
+        if inverse == 0 and m != 1:
+            raise ValueError(f"Modular inverse does not exist for {a} mod {m}")
+        return inverse
+    
+    # Pure-Python fallback when gmpy2 is not installed
     gcd_val, x, _ = extended_gcd(a % m, m)
     if gcd_val != 1:
         raise ValueError(f"Modular inverse does not exist for {a} mod {m}")
-    return (x % m + m) % m
+    # extended_gcd keeps |x| < m, so a negative x only needs one + m
+    return x + m if x < 0 else x
+
+
+# Odd primes below 1000, for cheap trial division before Miller-Rabin
+_SMALL_PRIMES = [p for p in range(3, 1000, 2) if all(p % f for f in range(3, int(p ** 0.5) + 1, 2))]
+
+# Number of odd candidates sieved at once by generate_prime
+_SIEVE_WINDOW = 1024
 
+# Standard RSA public exponent (2^16 + 1, a prime)
+PUBLIC_EXPONENT = 65537
 
-def is_prime(n, k=5):
-    """Simple probabilistic primality test (Miller-Rabin)"""
+# Fixed Miller-Rabin witnesses: deterministic for all n < 3.3e24, and no RNG calls
+_MR_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+def is_prime(n):
+    """Miller-Rabin primality test with fixed witnesses (exact for n < 3.3e24)"""
     if n < 2:
         return False
     if n == 2 or n == 3:
@@ -29,22 +69,37 @@ def is_prime(n, k=5):
     if n % 2 == 0:
         return False
     
-    # Write n-1 as d * 2^r
-    r = 0
-    d = n - 1
-    while d % 2 == 0:
-        r += 1
-        d //= 2
+    # Most random odd numbers have a small factor - reject them without any modexp
+    for p in _SMALL_PRIMES:
+        if n == p:
+            return True
+        if n % p == 0:
+            return False
     
-    # Witness loop
-    for _ in range(k):
-        a = random.randrange(2, n - 1)
+    return _miller_rabin(n)
+
+
+def _miller_rabin(n):
+    """Miller-Rabin rounds only: n must be odd, > 1000 and free of factors in _SMALL_PRIMES"""
+    # With gmpy2, each witness round (modexp + squaring loop) runs inside GMP,
+    # which keeps the numbers in Montgomery form for the whole round
+    if is_strong_prp is not None:
+        return all(is_strong_prp(n, a) for a in _MR_WITNESSES)
+    
+    # Write n-1 as d * 2^r: (n-1) & -(n-1) isolates the lowest set bit, so r is its position
+    n_minus_1 = n - 1
+    r = (n_minus_1 & -n_minus_1).bit_length() - 1
+    d = n_minus_1 >> r
+    
+    # Witness loop (n > 997 here, so every witness is < n - 1)
+    # n, d, r and n - 1 are the same for every witness, so they are computed once above
+    for a in _MR_WITNESSES:
         x = pow(a, d, n)
-        if x == 1 or x == n - 1:
+        if x == 1 or x == n_minus_1:
             continue
         for _ in range(r - 1):
             x = pow(x, 2, n)
-            if x == n - 1:
+            if x == n_minus_1:
                 break
         else:
             return False
@@ -53,13 +108,33 @@ def is_prime(n, k=5):
 
 def generate_prime(bits=512):
     """Generate a random prime number with approximately 'bits' bits"""
+    limit = 1 << bits
     while True:
-        # Generate a random odd number
-        candidate = random.randrange(2**(bits-1), 2**bits)
-        if candidate % 2 == 0:
-            candidate += 1
-        if is_prime(candidate):
-            return candidate
+        # Generate a random odd starting point, then look at base, base+2, base+4, ...
+        # One randbits call from the OS CSPRNG, with the top bit forced so base has 'bits' bits
+        base = secrets.randbits(bits - 1) | (1 << (bits - 1)) | 1
+        
+        # Sieve the window: sieve[i] stays 1 only if base + 2*i has no factor in _SMALL_PRIMES.
+        # Each small prime costs one modulo and one C-level slice assignment, so composites
+        # are ruled out without running Miller-Rabin on them
+        sieve = bytearray([1]) * _SIEVE_WINDOW
+        for p in _SMALL_PRIMES:
+            # First i with base + 2*i divisible by p ((p + 1) // 2 is 2^-1 mod p)
+            i = (-base * ((p + 1) // 2)) % p
+            if base + 2 * i == p:
+                i += p  # p itself is prime, don't cross it out
+            sieve[i::p] = bytes(len(range(i, _SIEVE_WINDOW, p)))
+        
+        for i in range(_SIEVE_WINDOW):
+            candidate = base + 2 * i
+            if candidate >= limit:
+                break  # Ran past the bit size, start over from a new random base
+            if not sieve[i]:
+                continue
+            # Survivors already passed trial division by _SMALL_PRIMES, so go straight to
+            # Miller-Rabin (tiny candidates below 1000 still take the full is_prime path)
+            if _miller_rabin(candidate) if candidate > 1000 else is_prime(candidate):
+                return candidate
 
 
 class SimpleRSA:
@@ -67,16 +142,25 @@ class SimpleRSA:
         """
         Initialize RSA with:
         - p, q: prime numbers (if None, will be generated)
-        - d: secret key (private exponent, if None, will be generated)
+        - d: secret key (private exponent, if None, derived from e = 65537)
         """
-        # Generate or use provided primes
+        # Only caller-supplied primes need checking - generate_prime already ran Miller-Rabin
+        if (p is not None and not is_prime(p)) or (q is not None and not is_prime(q)):
+            raise ValueError("p and q must be prime numbers")
+        
+        # Generate missing primes
+        # (generated primes also need gcd(e, p-1) == 1 so that e = 65537 is usable)
         if p is None:
             p = generate_prime(256)  # 256-bit primes for n ~512 bits
+            while gcd(PUBLIC_EXPONENT, p - 1) != 1:
+                p = generate_prime(256)
         if q is None:
             q = generate_prime(256)
+            while gcd(PUBLIC_EXPONENT, q - 1) != 1:
+                q = generate_prime(256)
         
-        if not is_prime(p) or not is_prime(q):
-            raise ValueError("p and q must be prime numbers")
+        if p == q:
+            raise ValueError("p and q must be different primes")
         
         self.p = p
         self.q = q
@@ -89,32 +173,55 @@ class SimpleRSA:
         
         # Generate or use provided secret key d
         if d is None:
-            # Generate a valid d (must be coprime with phi(n))
-            while True:
-                d = random.randrange(2, self.phi_n)
-                if gcd(d, self.phi_n) == 1:
-                    break
+            # Like real RSA, fix the public exponent e = 65537 and derive d = e^-1 mod phi(n)
+            # A small e makes encryption cheap: 16 squarings + 1 multiplication
+            if gcd(PUBLIC_EXPONENT, self.phi_n) != 1:
+                raise ValueError(f"e = {PUBLIC_EXPONENT} must be coprime with phi(n) = {self.phi_n}")
+            self.e = PUBLIC_EXPONENT
+            self.d = mod_inverse(self.e, self.phi_n)
         else:
             # Verify d is valid
             if gcd(d, self.phi_n) != 1:
                 raise ValueError(f"d must be coprime with phi(n) = {self.phi_n}")
+            self.d = d
+            
+            # Compute e = d^-1 mod phi(n) (public exponent)
+            self.e = mod_inverse(self.d, self.phi_n)
         
-        self.d = d
+        # CRT values for decryption: two half-size modexps (mod p and mod q)
+        # instead of one full-size modexp mod n - roughly 4x less work
+        self.d_p = self.d % (p - 1)
+        self.d_q = self.d % (q - 1)
+        self.q_inv = mod_inverse(q, p)
         
-        # Compute e = d^-1 mod phi(n) (public exponent)
-        self.e = mod_inverse(self.d, self.phi_n)
+        # Convert once to gmpy2 numbers so encrypt/decrypt don't redo it every call
+        self._n_mpz = mpz(self.n)
+        self._e_mpz = mpz(self.e)
+        self._p_mpz = mpz(self.p)
+        self._q_mpz = mpz(self.q)
+        self._d_p_mpz = mpz(self.d_p)
+        self._d_q_mpz = mpz(self.d_q)
+        self._q_inv_mpz = mpz(self.q_inv)
     
     def encrypt(self, message):
-        """Encrypt a message using public key (e, n)"""
+        """Encrypt a message (str, bytes or int) using public key (e, n)"""
         if isinstance(message, str):
-            message = int.from_bytes(message.encode('utf-8'), 'big')
+            message = message.encode('utf-8')
+        if isinstance(message, (bytes, bytearray)):
+            # Already-encoded bytes are converted directly, without a str round-trip
+            message = int.from_bytes(message, 'big')
         if message >= self.n:
             raise ValueError(f"Message too large. Must be < n = {self.n}")
-        return pow(message, self.e, self.n)
+        return int(powmod(message, self._e_mpz, self._n_mpz))
     
     def decrypt(self, ciphertext):
-        """Decrypt a ciphertext using private key (d, n)"""
-        message_int = pow(ciphertext, self.d, self.n)
+        """Decrypt a ciphertext using private key (d, n), via the Chinese Remainder Theorem"""
+        # m1 = c^d mod p and m2 = c^d mod q (Fermat lets us reduce d mod p-1 and q-1)
+        m1 = powmod(ciphertext, self._d_p_mpz, self._p_mpz)
+        m2 = powmod(ciphertext, self._d_q_mpz, self._q_mpz)
+        # Recombine (Garner's formula): m = m2 + q * ((m1 - m2) * q^-1 mod p)
+        h = (self._q_inv_mpz * (m1 - m2)) % self._p_mpz
+        message_int = int(m2 + h * self._q_mpz)
         return message_int.to_bytes((message_int.bit_length() + 7) // 8, 'big').decode('utf-8')
     
     def get_public_key(self):
@@ -129,35 +236,8 @@ class SimpleRSA:
         return f"SimpleRSA(p={self.p}, q={self.q}, n={self.n}, d={self.d}, e={self.e})"
 
 
-# Example usage
-if __name__ == "__main__":
-    # Create RSA instance
-    rsa = SimpleRSA()
-    print("RSA Parameters:")
-    print(f"p = {rsa.p}")
-    print(f"q = {rsa.q}")
-    print(f"n = p * q = {rsa.n}")
-    print(f"phi(n) = (p-1) * (q-1) = {rsa.phi_n}")
-    print(f"d (secret key) = {rsa.d}")
-    print(f"e = d^-1 mod phi(n) = {rsa.e}")
-    print()
-    
-    # Test encryption/decryption
-    message = "Hello, RSA!"
-    print(f"Original message: {message}")
-    
-    ciphertext = rsa.encrypt(message)
-    print(f"Ciphertext: {ciphertext}")
-    
-    decrypted = rsa.decrypt(ciphertext)
-    print(f"Decrypted message: {decrypted}")
-    print()
-    
-    # Show keys
-    public_key = rsa.get_public_key()
-    private_key = rsa.get_private_key()
-    print(f"Public key (e, n): {public_key}")
-    print(f"Private key (d, n): {private_key}")
+def demo_crypto_library():
+    """Show the same RSA workflow with the cryptography library (2048-bit keygen + OAEP)"""
     print("\n" + "="*60)
     print("Using cryptography library RSA package:")
     print("="*60)
@@ -240,3 +320,39 @@ if __name__ == "__main__":
         print("\nNote: cryptography library not installed.")
         print("Install it with: pip install cryptography")
 
+
+# Example usage
+if __name__ == "__main__":
+    # Create RSA instance
+    rsa = SimpleRSA()
+    print("RSA Parameters:")
+    print(f"p = {rsa.p}")
+    print(f"q = {rsa.q}")
+    print(f"n = p * q = {rsa.n}")
+    print(f"phi(n) = (p-1) * (q-1) = {rsa.phi_n}")
+    print(f"e (public exponent) = {rsa.e}")
+    print(f"d = e^-1 mod phi(n) (secret key) = {rsa.d}")
+    print()
+    
+    # Test encryption/decryption
+    message = "Hello, RSA!"
+    print(f"Original message: {message}")
+    
+    ciphertext = rsa.encrypt(message)
+    print(f"Ciphertext: {ciphertext}")
+    
+    decrypted = rsa.decrypt(ciphertext)
+    print(f"Decrypted message: {decrypted}")
+    print()
+    
+    # Show keys
+    public_key = rsa.get_public_key()
+    private_key = rsa.get_private_key()
+    print(f"Public key (e, n): {public_key}")
+    print(f"Private key (d, n): {private_key}")
+    
+    # The library demo generates a 2048-bit key, which takes a while - only run it on request
+    if '--crypto-demo' in sys.argv:
+        demo_crypto_library()
+    else:
+        print("\nRun with --crypto-demo to also see the cryptography library RSA example")